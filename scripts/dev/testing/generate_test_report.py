@@ -9,76 +9,32 @@
 import os
 import json
 import base64
+import argparse
+import hashlib
+import mmap
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 
 # Configuration
 RESULTS_DIR = "test_results/firebase"
 OUTPUT_FILE = "test_results/firebase_test_report.html"
+ASSETS_DIR = "assets"  # Screenshot copies, relative to the HTML report
+
+# Screenshot filename format: 01_description_device_version
+SCREENSHOT_NAME_RE = re.compile(r"^(?P<step>\d+)(?:_(?P<description>.*))?$")
 
 # Colors
 GREEN = '\033[0;32m'
 YELLOW = '\033[1;33m'
 NC = '\033[0m'  # No Color
 
-class TestReport:
-    def __init__(self):
-        self.android_screenshots = []
-        self.ios_screenshots = []
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    def collect_screenshots(self):
-        """Collect screenshots from Android and iOS directories"""
-        print(f"{GREEN}📸 Collecting screenshots...{NC}")
-
-        # Android screenshots
-        android_dir = Path(RESULTS_DIR) / "android"
-        if android_dir.exists():
-            self.android_screenshots = self._find_screenshots(android_dir)
-            print(f"  Found {len(self.android_screenshots)} Android screenshots")
-
-        # iOS screenshots
-        ios_dir = Path(RESULTS_DIR) / "ios"
-        if ios_dir.exists():
-            self.ios_screenshots = self._find_screenshots(ios_dir)
-            print(f"  Found {len(self.ios_screenshots)} iOS screenshots")
-
-    def _find_screenshots(self, directory: Path) -> List[Dict]:
-        """Find all PNG screenshots in directory"""
-        screenshots = []
-        for png_file in directory.rglob("*.png"):
-            # Parse filename to extract step info
-            filename = png_file.stem
-            parts = filename.split("_")
-
-            # Try to extract step number (format: 01_description_device_version)
-            step_number = parts[0] if parts[0].isdigit() else "00"
-
-            screenshots.append({
-                "path": str(png_file),
-                "filename": png_file.name,
-                "step": int(step_number) if step_number.isdigit() else 0,
-                "description": "_".join(parts[1:]) if len(parts) > 1 else filename
-            })
-
-        # Sort by step number
-        return sorted(screenshots, key=lambda x: x["step"])
-
-    def _image_to_base64(self, image_path: str) -> str:
-        """Convert image to base64 for embedding in HTML"""
-        try:
-            with open(image_path, "rb") as img_file:
-                return base64.b64encode(img_file.read()).decode('utf-8')
-        except Exception as e:
-            print(f"{YELLOW}⚠️  Failed to encode {image_path}: {e}{NC}")
-            return ""
-
-    def generate_html(self) -> str:
-        """Generate HTML report"""
-        print(f"{GREEN}📄 Generating HTML report...{NC}")
-
-        html = f"""<!DOCTYPE html>
+# HTML templates, formatted once per report section
+PAGE_HEADER_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -279,21 +235,21 @@ class TestReport:
     <div class="container">
         <header>
             <h1>🌊 WorldWideWaves - Firebase Test Lab Report</h1>
-            <p>E2E UI Test Results | Generated: {self.timestamp}</p>
+            <p>E2E UI Test Results | Generated: {timestamp}</p>
         </header>
 
         <div class="summary">
             <div class="summary-card">
                 <h3>Android Screenshots</h3>
-                <div class="value">{len(self.android_screenshots)}</div>
+                <div class="value">{android_count}</div>
             </div>
             <div class="summary-card">
                 <h3>iOS Screenshots</h3>
-                <div class="value">{len(self.ios_screenshots)}</div>
+                <div class="value">{ios_count}</div>
             </div>
             <div class="summary-card">
                 <h3>Total Steps</h3>
-                <div class="value">{max(len(self.android_screenshots), len(self.ios_screenshots))}</div>
+                <div class="value">{total_steps}</div>
             </div>
             <div class="summary-card">
                 <h3>Test Status</h3>
@@ -305,62 +261,38 @@ class TestReport:
             <h2 style="margin-bottom: 30px;">📸 Test Journey Screenshots</h2>
 """
 
-        # Generate screenshot comparison for each step
-        all_steps = set()
-        for screenshot in self.android_screenshots + self.ios_screenshots:
-            all_steps.add(screenshot["step"])
-
-        for step in sorted(all_steps):
-            android_screenshot = next((s for s in self.android_screenshots if s["step"] == step), None)
-            ios_screenshot = next((s for s in self.ios_screenshots if s["step"] == step), None)
-
-            description = (android_screenshot or ios_screenshot)["description"]
-
-            html += f"""
+STEP_HEADER_TEMPLATE = """
             <div class="step">
                 <div class="step-header">
-                    <h3>Step {step:02d}: {description.replace('_', ' ').title()}</h3>
+                    <h3>Step {step:02d}: {title}</h3>
                 </div>
                 <div class="step-content">
                     <div class="platform">
                         <h4>📱 Android <span class="badge android">Pixel/Galaxy</span></h4>
 """
 
-            if android_screenshot:
-                img_data = self._image_to_base64(android_screenshot["path"])
-                html += f"""
-                        <img src="data:image/png;base64,{img_data}" alt="{android_screenshot['filename']}" onclick="window.open(this.src)">
-                        <div class="filename">{android_screenshot['filename']}</div>
+SCREENSHOT_TEMPLATE = """
+                        <img {source} alt="{filename}" onclick="window.open(this.src)">
+                        <div class="filename">{filename}</div>
 """
-            else:
-                html += """
+
+NO_SCREENSHOT_HTML = """
                         <div class="no-screenshot">No screenshot available</div>
 """
 
-            html += """
+PLATFORM_SEPARATOR_HTML = """
                     </div>
                     <div class="platform">
                         <h4>🍎 iOS <span class="badge ios">iPhone/iPad</span></h4>
 """
 
-            if ios_screenshot:
-                img_data = self._image_to_base64(ios_screenshot["path"])
-                html += f"""
-                        <img src="data:image/png;base64,{img_data}" alt="{ios_screenshot['filename']}" onclick="window.open(this.src)">
-                        <div class="filename">{ios_screenshot['filename']}</div>
-"""
-            else:
-                html += """
-                        <div class="no-screenshot">No screenshot available</div>
-"""
-
-            html += """
+STEP_FOOTER_HTML = """
                     </div>
                 </div>
             </div>
 """
 
-        html += f"""
+PAGE_FOOTER_HTML = """
         </div>
 
         <footer>
@@ -376,32 +308,201 @@ class TestReport:
 
     <script>
         // Click to open image in new tab
-        document.querySelectorAll('.platform img').forEach(img => {{
+        document.querySelectorAll('.platform img').forEach(img => {
             img.style.cursor = 'pointer';
-        }});
+        });
+
+        // Embedded duplicates reuse the payload of the first identical screenshot
+        document.querySelectorAll('img[data-ref]').forEach(img => {
+            img.src = document.getElementById(img.dataset.ref).src;
+        });
     </script>
 </body>
 </html>
 """
-        return html
+
+def _iter_png_files(directory: Path) -> Iterator[os.DirEntry]:
+    """Recursively yield PNG entries, using cached dirent types instead of stat calls"""
+    stack = [str(directory)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".png"):
+                    yield entry
+
+class TestReport:
+    def __init__(self, embed: bool = False):
+        self.embed = embed
+        self.payloads = {}  # Base64 data per distinct screenshot digest (embed mode)
+        self._emitted_digests = set()
+        self.android_screenshots = []
+        self.ios_screenshots = []
+        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def collect_screenshots(self):
+        """Collect screenshots from Android and iOS directories"""
+        print(f"{GREEN}📸 Collecting screenshots...{NC}")
+
+        # Android screenshots
+        android_dir = Path(RESULTS_DIR) / "android"
+        if android_dir.exists():
+            self.android_screenshots = self._find_screenshots(android_dir)
+            print(f"  Found {len(self.android_screenshots)} Android screenshots")
+
+        # iOS screenshots
+        ios_dir = Path(RESULTS_DIR) / "ios"
+        if ios_dir.exists():
+            self.ios_screenshots = self._find_screenshots(ios_dir)
+            print(f"  Found {len(self.ios_screenshots)} iOS screenshots")
+
+        if self.embed:
+            self._encode_screenshots()
+
+    def _encode_screenshots(self):
+        """Hash and base64-encode all screenshots in parallel, keeping one payload per digest"""
+        screenshots = self.android_screenshots + self.ios_screenshots
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            encoded = executor.map(self._image_to_base64, [s["path"] for s in screenshots])
+
+            for screenshot, (digest, payload) in zip(screenshots, encoded):
+                screenshot["digest"] = digest
+                self.payloads.setdefault(digest, payload)
+
+    def _find_screenshots(self, directory: Path) -> List[Dict]:
+        """Find all PNG screenshots in directory"""
+        screenshots = []
+        for png_file in _iter_png_files(directory):
+            # Parse filename to extract step info
+            filename = png_file.name[:-len(".png")]
+            match = SCREENSHOT_NAME_RE.match(filename)
+            step = int(match["step"]) if match else 0
+            description = match["description"] if match and match["description"] is not None else filename
+
+            relative_path = Path(os.path.relpath(png_file.path, directory)).as_posix()
+
+            screenshots.append({
+                "path": png_file.path,
+                "asset": f"{ASSETS_DIR}/{directory.name}/{relative_path}",
+                "filename": png_file.name,
+                "step": step,
+                "description": description
+            })
+
+        # Sort by step number
+        return sorted(screenshots, key=lambda x: x["step"])
+
+    def _image_to_base64(self, image_path: str) -> Tuple[str, str]:
+        """SHA-256 and base64 of an image for embedding in HTML, from a single read"""
+        try:
+            with open(image_path, "rb") as img_file:
+                # mmap cannot map an empty file
+                if os.fstat(img_file.fileno()).st_size == 0:
+                    return hashlib.sha256().hexdigest(), ""
+                with mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return hashlib.sha256(data).hexdigest(), base64.b64encode(data).decode('utf-8')
+        except Exception as e:
+            print(f"{YELLOW}⚠️  Failed to encode {image_path}: {e}{NC}")
+            return image_path, ""
+
+    def _screenshot_html(self, screenshot: Optional[Dict]) -> str:
+        """Render one platform cell of a step"""
+        if not screenshot:
+            return NO_SCREENSHOT_HTML
+        if not self.embed:
+            source = f'src="{quote(screenshot["asset"])}"'
+        else:
+            # Identical screenshots embed their payload once and reference it afterwards
+            element_id = f"h{screenshot['digest']}"
+            if element_id in self._emitted_digests:
+                source = f'data-ref="{element_id}"'
+            else:
+                self._emitted_digests.add(element_id)
+                source = f'id="{element_id}" src="data:image/png;base64,{self.payloads[screenshot["digest"]]}"'
+        return SCREENSHOT_TEMPLATE.format(source=source, filename=screenshot["filename"])
+
+    def _render_step(self, step: int, android_screenshot: Optional[Dict], ios_screenshot: Optional[Dict]) -> str:
+        """Render the side-by-side comparison for one step"""
+        description = (android_screenshot or ios_screenshot)["description"]
+
+        return "".join((
+            STEP_HEADER_TEMPLATE.format(step=step, title=description.replace('_', ' ').title()),
+            self._screenshot_html(android_screenshot),
+            PLATFORM_SEPARATOR_HTML,
+            self._screenshot_html(ios_screenshot),
+            STEP_FOOTER_HTML,
+        ))
+
+    def generate_html(self) -> str:
+        """Generate HTML report"""
+        print(f"{GREEN}📄 Generating HTML report...{NC}")
+        self._emitted_digests.clear()
+
+        parts = [PAGE_HEADER_TEMPLATE.format(
+            timestamp=self.timestamp,
+            android_count=len(self.android_screenshots),
+            ios_count=len(self.ios_screenshots),
+            total_steps=max(len(self.android_screenshots), len(self.ios_screenshots)),
+        )]
+
+        # Index screenshots by step (reversed so the first one per step wins)
+        android_by_step = {s["step"]: s for s in reversed(self.android_screenshots)}
+        ios_by_step = {s["step"]: s for s in reversed(self.ios_screenshots)}
+
+        # Generate screenshot comparison for each step
+        parts.extend(
+            self._render_step(step, android_by_step.get(step), ios_by_step.get(step))
+            for step in sorted(android_by_step.keys() | ios_by_step.keys())
+        )
+
+        parts.append(PAGE_FOOTER_HTML)
+        return "".join(parts)
+
+    def _stage_assets(self, output_dir: Path):
+        """Hard-link (or copy) screenshots next to the report so it can reference them"""
+        # Start from an empty directory so screenshots removed from the results don't linger
+        shutil.rmtree(output_dir / ASSETS_DIR, ignore_errors=True)
+
+        for screenshot in self.android_screenshots + self.ios_screenshots:
+            target = output_dir / screenshot["asset"]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(screenshot["path"], target)
+            except OSError:
+                shutil.copyfile(screenshot["path"], target)
 
     def save_report(self, html: str):
         """Save HTML report to file"""
         output_path = Path(OUTPUT_FILE)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        if not self.embed:
+            self._stage_assets(output_path.parent)
+
+        # Encode once and write the bytes directly, bypassing the text-mode wrapper
+        data = memoryview(html.encode('utf-8'))
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
 
         print(f"{GREEN}✅ Report saved to: {output_path}{NC}")
         print(f"{GREEN}📂 Open in browser: file://{output_path.absolute()}{NC}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate the Firebase Test Lab HTML report")
+    parser.add_argument("--embed", action="store_true",
+                        help="inline screenshots as base64 for a single-file report")
+    args = parser.parse_args()
+
     print(f"{GREEN}🚀 Firebase Test Lab Report Generator{NC}")
     print("=" * 50)
     print()
 
-    report = TestReport()
+    report = TestReport(embed=args.embed)
     report.collect_screenshots()
 
     if not report.android_screenshots and not report.ios_screenshots:
@@ -19,14 +19,33 @@
 
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import base64
+import argparse
+import binascii
 import os
+import shutil
+import threading
 import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from pathlib import Path
 
-client = OpenAI()  # uses OPENAI_API_KEY
+# uses OPENAI_API_KEY; the client retries 429/5xx with exponential backoff
+client = OpenAI(max_retries=5)
+
+# Concurrent requests in flight, and minimum spacing between request starts
+MAX_WORKERS = 8  # override with --workers
+REQUEST_INTERVAL = 1.5  # seconds, be nice to the API
+
+# base64 characters decoded per write; a multiple of 4 so chunks decode independently
+B64_CHUNK_SIZE = 64 * 1024
+# Bytes copied per read when downloading image URLs
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
 
 # Output directory
 output_dir = Path("generated_images")
@@ -45,12 +64,10 @@ cities = [ "delhi_india", "karachi_pakistan", "bangalore_india", "bangkok_thaila
 ]
 
 # Template prompt
-def build_prompt(city):
-    return (
-        f"""
+PROMPT_TEMPLATE = """
 Create a 1024×1024 realistic-cartoon illustration.
-Subject: a peaceful city-scale human wave (stadium “ola”) rippling through {city.replace('_', ', ')}. Thousands of joyful, diverse people raise and lower arms in sequence along main avenues, bridges, and plazas. The scene celebrates unity, empathy, and shared joy. No impression of dystopic regime, people do not raise one arm only for instance. No flags.
-View: high, wide, readable bird’s-eye that clearly shows the wave’s path and recognizable landmarks of {city.replace('_', ', ')} without copying any copyrighted designs.
+Subject: a peaceful city-scale human wave (stadium “ola”) rippling through {city_name}. Thousands of joyful, diverse people raise and lower arms in sequence along main avenues, bridges, and plazas. The scene celebrates unity, empathy, and shared joy. No impression of dystopic regime, people do not raise one arm only for instance. No flags.
+View: high, wide, readable bird’s-eye that clearly shows the wave’s path and recognizable landmarks of {city_name} without copying any copyrighted designs.
 Style: fine cartoon realism, clean lines, vivid colors, gentle gradients, soft global lighting, subtle depth cues, lively but not chaotic. Faces simplified, no celebrities. Clothing varied and modern. No legible text or logos.
 Environment: add local topography and textures (waterfronts, parks, hills, skylines) matching the city’s character. Natural elements feel welcoming.
 Mood: optimistic, inclusive, festive, non-political, non-commercial.
@@ -69,18 +86,50 @@ Safety and coherence:
 
 Deliver: one square image, 1024×1024, matching all instructions above.
         """
-    )
+
+def build_prompt(city):
+    return PROMPT_TEMPLATE.format(city_name=city.replace('_', ', '))
+
+# Space request starts REQUEST_INTERVAL apart across all worker threads
+def wait_for_request_slot():
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_request_at)
+        _next_request_at = slot + REQUEST_INTERVAL
+    time.sleep(slot - now)
+
+# Decode a base64 payload to disk chunk by chunk, without a full decoded copy
+def write_base64(data, output_path):
+    with open(output_path, "wb") as f:
+        for start in range(0, len(data), B64_CHUNK_SIZE):
+            f.write(binascii.a2b_base64(data[start:start + B64_CHUNK_SIZE]))
+
+# True if a previous run already produced this image
+def is_generated(output_path):
+    try:
+        with open(output_path, "rb") as f:
+            return f.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+    except OSError:
+        return False
 
 # Generate and save image
 def generate_image(city):
     filename = f"e_location_{city}.png"
     output_path = output_dir / filename
+    # Written under a temporary name so an interrupted run never leaves a partial PNG
+    partial_path = output_dir / f"{filename}.part"
+
+    if is_generated(output_path):
+        print(f"⏭  Skipping {filename} (already generated)")
+        return
 
     print(f"Generating: {filename}")
 
     prompt = build_prompt(city)
 
     try:
+        wait_for_request_slot()
         response = client.images.generate(
             model=os.getenv("OPENAI_IMAGE_MODEL", "dall-e-3"),
             prompt=prompt,
@@ -90,14 +139,14 @@ def generate_image(city):
         )
         item = response.data[0]
         if getattr(item, "b64_json", None):
-            image_data = base64.b64decode(item.b64_json)
+            write_base64(item.b64_json, partial_path)
         elif getattr(item, "url", None):
-            image_data = urllib.request.urlopen(item.url).read()
+            with urllib.request.urlopen(item.url) as resp, open(partial_path, "wb") as f:
+                shutil.copyfileobj(resp, f, DOWNLOAD_CHUNK_SIZE)
         else:
             raise RuntimeError("No image payload returned")
 
-        with open(output_path, "wb") as f:
-            f.write(image_data)
+        os.replace(partial_path, output_path)
 
         print(f"✅ Saved: {output_path}")
 
@@ -105,9 +154,18 @@ def generate_image(city):
         print(f"❌ Error generating {city}: {e}")
 
 # Main execution
-for city in cities:
-    generate_image(city)
-    time.sleep(1.5)  # Be nice to the API
+parser = argparse.ArgumentParser(description="Generate city cover images with the OpenAI Images API")
+parser.add_argument("--cities", help="comma-separated city suffixes to generate (default: all)")
+parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="concurrent API requests")
+args = parser.parse_args()
+
+requested = [c.strip() for c in args.cities.split(",") if c.strip()] if args.cities else cities
+# dict.fromkeys drops duplicates while keeping order, so no city is paid for twice
+selected_cities = list(dict.fromkeys(requested))
+
+# Image generation is network-bound, so overlap requests
+with ThreadPoolExecutor(max_workers=args.workers) as executor:
+    list(executor.map(generate_image, selected_cities))
 
 print("🎉 All images generated.")
 
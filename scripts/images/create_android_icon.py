@@ -23,10 +23,13 @@ Create Android adaptive launcher icons with lighting effects.
 Generates foreground, background, and legacy icons for all densities.
 """
 
-from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
-import math
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import os
 
+from icon_effects import add_white_overlay, enhance_colors
+
 # Android icon densities and sizes
 DENSITIES = {
     'mdpi': 48,
@@ -43,42 +46,14 @@ def add_lighting_effects(img):
     """
     Add subtle Android Material Design lighting effects.
     """
-    size = img.size[0]
-
     if img.mode != 'RGBA':
         img = img.convert('RGBA')
 
-    # Top shine gradient (more subtle than iOS)
-    shine = Image.new('RGBA', (size, size), (255, 255, 255, 0))
-    draw = ImageDraw.Draw(shine)
-
-    for y in range(size // 2):
-        alpha = int(35 * (1 - y / (size // 2)) ** 2)
-        draw.rectangle([0, y, size, y + 1], fill=(255, 255, 255, alpha))
-
-    img = Image.alpha_composite(img, shine)
-
-    # Center radial glow
-    radial = Image.new('RGBA', (size, size), (255, 255, 255, 0))
-    center = size // 2
-
-    for x in range(0, size, 2):
-        for y in range(0, size, 2):
-            distance = math.sqrt((x - center) ** 2 + (y - center) ** 2)
-            if distance < center * 0.6:
-                alpha = int(15 * (1 - distance / (center * 0.6)) ** 2)
-                for dx in range(2):
-                    for dy in range(2):
-                        if x + dx < size and y + dy < size:
-                            radial.putpixel((x + dx, y + dy), (255, 255, 255, alpha))
-
-    radial = radial.filter(ImageFilter.GaussianBlur(30))
-    img = Image.alpha_composite(img, radial)
+    # Top shine and center glow (more subtle than iOS)
+    img = add_white_overlay(img, shine_peak=35, shine_exp=2, glow_radius_frac=0.6, glow_peak=15)
 
     # Material Design enhancement: slightly more contrast and saturation
-    img = ImageEnhance.Contrast(img).enhance(1.15)
-    img = ImageEnhance.Color(img).enhance(1.1)
-    img = ImageEnhance.Brightness(img).enhance(1.03)
+    img = enhance_colors(img, contrast=1.15, color=1.1, brightness=1.03)
 
     return img
 
@@ -129,20 +104,18 @@ def create_monochrome(source_img, size):
     Create monochrome icon for themed icons (Android 13+).
     """
     # Convert to grayscale then to pure white on transparent
-    gray = source_img.convert('L')
-    monochrome = Image.new('RGBA', gray.size, (255, 255, 255, 0))
+    gray = np.asarray(source_img.convert('L'))
 
-    for x in range(gray.size[0]):
-        for y in range(gray.size[1]):
-            alpha = gray.getpixel((x, y))
-            if alpha > 50:  # Threshold
-                monochrome.putpixel((x, y), (255, 255, 255, alpha))
+    rgba = np.full(gray.shape + (4,), 255, np.uint8)
+    rgba[..., 3] = np.where(gray > 50, gray, 0)  # Threshold
+    monochrome = Image.fromarray(rgba, 'RGBA')
 
     return monochrome.resize((size, size), Image.LANCZOS)
 
-def generate_android_icons(input_path, output_base_dir):
+def generate_android_icons(input_path, output_base_dir, fast=False):
     """
     Generate all Android launcher icons.
+    Fast mode trades PNG size for encode time while iterating.
     """
     print(f"📱 Loading source icon from {input_path}")
 
@@ -150,12 +123,22 @@ def generate_android_icons(input_path, output_base_dir):
     size = min(source.size)
     source = source.crop((0, 0, size, size)).convert('RGBA')
 
+    # Every output is downscaled from the largest adaptive icon, so apply the
+    # lighting once at that size rather than at full source resolution
+    max_size = int(max(DENSITIES.values()) * ADAPTIVE_MULTIPLIER)
+    if size > max_size:
+        source = source.resize((max_size, max_size), Image.LANCZOS)
+
     print(f"✨ Applying lighting effects...")
     source_enhanced = add_lighting_effects(source)
 
     print(f"🎨 Generating icons for all densities...")
 
-    for density, base_size in DENSITIES.items():
+    # The default output is committed, so keep PNGs small unless asked for speed
+    save_options = {'compress_level': 1} if fast else {'optimize': True}
+
+    def build(item):
+        density, base_size = item
         print(f"  - {density} ({base_size}dp)")
 
         # Adaptive icon sizes (108dp)
@@ -167,35 +150,38 @@ def generate_android_icons(input_path, output_base_dir):
 
         # Generate foreground
         foreground = create_foreground(source_enhanced, adaptive_size)
-        foreground.save(os.path.join(output_dir, 'ic_launcher_foreground.png'), 'PNG')
+        foreground.save(os.path.join(output_dir, 'ic_launcher_foreground.png'), 'PNG', **save_options)
 
         # Generate background
         background = create_background(source, adaptive_size)
-        background.save(os.path.join(output_dir, 'ic_launcher_background.png'), 'PNG')
+        background.save(os.path.join(output_dir, 'ic_launcher_background.png'), 'PNG', **save_options)
 
         # Generate monochrome
         monochrome = create_monochrome(source_enhanced, adaptive_size)
-        monochrome.save(os.path.join(output_dir, 'ic_launcher_monochrome.png'), 'PNG')
+        monochrome.save(os.path.join(output_dir, 'ic_launcher_monochrome.png'), 'PNG', **save_options)
 
         # Generate legacy icon
         legacy = create_legacy_icon(source_enhanced, base_size)
-        legacy.save(os.path.join(output_dir, 'ic_launcher.png'), 'PNG')
+        legacy.save(os.path.join(output_dir, 'ic_launcher.png'), 'PNG', **save_options)
+
+    # Densities are independent and Pillow releases the GIL while resizing and encoding
+    with ThreadPoolExecutor(max_workers=len(DENSITIES)) as executor:
+        list(executor.map(build, DENSITIES.items()))
 
     print(f"✅ Android icons generated successfully!")
     print(f"📁 Output directory: {output_base_dir}")
 
 if __name__ == '__main__':
-    import sys
-
-    input_path = 'misc/planet-square-1024.png'
-    output_dir = 'composeApp/src/androidMain/res'
+    import argparse
 
-    if len(sys.argv) > 1:
-        input_path = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_dir = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Generate Android adaptive launcher icons")
+    parser.add_argument("input_path", nargs="?", default='misc/planet-square-1024.png')
+    parser.add_argument("output_dir", nargs="?", default='composeApp/src/androidMain/res')
+    parser.add_argument("--fast", action="store_true",
+                        help="encode PNGs at zlib level 1 (larger files) for quick iteration")
+    args = parser.parse_args()
 
-    generate_android_icons(input_path, output_dir)
+    generate_android_icons(args.input_path, args.output_dir, args.fast)
     print(f"\n🎉 All Android launcher icons ready!")
     print(f"\n📝 Icon types generated:")
     print(f"   - ic_launcher_foreground.png (adaptive layer)")
@@ -23,72 +23,49 @@ Enhance iOS app icon with rounded corners and lighting effects.
 Creates iOS squircle shape with the design filling to the edges.
 """
 
-from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
-import math
+from PIL import Image, ImageDraw
+from multiprocessing import Pool
+import os
 
-def create_ios_squircle_mask(size):
+from icon_effects import add_white_overlay, enhance_colors
+
+# Pixel sizes used by iosApp AppIcon.appiconset
+IOS_ICON_SIZES = [40, 58, 60, 80, 87, 120, 152, 167, 180, 1024]
+
+def create_ios_squircle_mask(size, supersample=4):
     """
     Create iOS-style squircle (superellipse) mask.
     Uses the actual iOS corner radius formula.
     """
-    mask = Image.new('L', (size, size), 0)
+    # Draw at a higher resolution and downscale for anti-aliasing
+    big_size = size * supersample
+    mask = Image.new('L', (big_size, big_size), 0)
     draw = ImageDraw.Draw(mask)
 
     # iOS uses approximately 22.5% corner radius
-    corner_radius = int(size * 0.225)
+    corner_radius = int(big_size * 0.225)
 
     # Draw the rounded rectangle
     draw.rounded_rectangle(
-        [0, 0, size, size],
+        [0, 0, big_size - 1, big_size - 1],
         radius=corner_radius,
         fill=255
     )
 
-    # Apply slight blur for anti-aliasing
-    mask = mask.filter(ImageFilter.GaussianBlur(1))
-
-    return mask
+    return mask.resize((size, size), Image.LANCZOS)
 
 def add_lighting_effects(img):
     """
     Add subtle lighting effects: top shine, center glow, enhanced colors.
     """
-    size = img.size[0]
-
     if img.mode != 'RGBA':
         img = img.convert('RGBA')
 
-    # Top shine gradient
-    shine = Image.new('RGBA', (size, size), (255, 255, 255, 0))
-    draw = ImageDraw.Draw(shine)
-
-    for y in range(size // 2):
-        alpha = int(40 * (1 - y / (size // 2)) ** 1.8)
-        draw.rectangle([0, y, size, y + 1], fill=(255, 255, 255, alpha))
-
-    img = Image.alpha_composite(img, shine)
-
-    # Center radial glow
-    radial = Image.new('RGBA', (size, size), (255, 255, 255, 0))
-    center = size // 2
-
-    for x in range(0, size, 2):
-        for y in range(0, size, 2):
-            distance = math.sqrt((x - center) ** 2 + (y - center) ** 2)
-            if distance < center * 0.5:
-                alpha = int(18 * (1 - distance / (center * 0.5)) ** 2)
-                for dx in range(2):
-                    for dy in range(2):
-                        if x + dx < size and y + dy < size:
-                            radial.putpixel((x + dx, y + dy), (255, 255, 255, alpha))
-
-    radial = radial.filter(ImageFilter.GaussianBlur(35))
-    img = Image.alpha_composite(img, radial)
+    # Top shine and center glow
+    img = add_white_overlay(img, shine_peak=40, shine_exp=1.8, glow_radius_frac=0.5, glow_peak=18)
 
     # Enhance visual quality
-    img = ImageEnhance.Contrast(img).enhance(1.18)
-    img = ImageEnhance.Color(img).enhance(1.12)
-    img = ImageEnhance.Brightness(img).enhance(1.05)
+    img = enhance_colors(img, contrast=1.18, color=1.12, brightness=1.05)
 
     return img
 
@@ -117,16 +94,60 @@ def enhance_icon(input_path, output_path):
 
     return img
 
-if __name__ == '__main__':
-    import sys
+def export_icon_size(task):
+    """
+    Downscale the enhanced icon to a single size (pool worker).
+    """
+    img, output_dir, size = task
+    output_path = os.path.join(output_dir, f'AppIcon-{size}.png')
 
-    input_path = 'misc/planet-square-1024.png'
-    output_path = 'misc/planet-square-1024-enhanced.png'
+    img.resize((size, size), Image.LANCZOS).save(output_path, 'PNG')
 
-    if len(sys.argv) > 1:
-        input_path = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_path = sys.argv[2]
+    return output_path
 
-    enhance_icon(input_path, output_path)
-    print(f"\n🎉 Enhanced icon ready: {output_path}")
+def enhance_icon_set(input_path, output_dir):
+    """
+    Light the icon once, then export every iOS icon size in parallel.
+    """
+    img = Image.open(input_path)
+    size = min(img.size)
+    img = img.crop((0, 0, size, size)).convert('RGBA')
+
+    largest = max(IOS_ICON_SIZES)
+    if size < largest:
+        raise ValueError(f"Source icon is {size}px, the AppIcon set needs at least {largest}px")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"✨ Applying lighting effects...")
+    img = add_lighting_effects(img)
+
+    # iOS applies its own corner mask and rejects transparent app icons,
+    # so the set is flattened onto an opaque background instead of masked
+    opaque = Image.new('RGBA', img.size, (0, 0, 0, 255))
+    img = Image.alpha_composite(opaque, img)
+
+    print(f"📐 Exporting {len(IOS_ICON_SIZES)} icon sizes...")
+    # Images pickle, so workers get the pixels directly and nothing extra lands in output_dir
+    tasks = [(img, output_dir, size) for size in IOS_ICON_SIZES]
+
+    with Pool() as pool:
+        for output_path in pool.map(export_icon_size, tasks):
+            print(f"  - {output_path}")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enhance the iOS app icon")
+    parser.add_argument("input_path", nargs="?", default='misc/planet-square-1024.png')
+    parser.add_argument("output_path", nargs="?", default='misc/planet-square-1024-enhanced.png')
+    parser.add_argument("--all-sizes", action="store_true",
+                        help="treat output_path as a directory and export every AppIcon size")
+    args = parser.parse_args()
+
+    if args.all_sizes:
+        enhance_icon_set(args.input_path, args.output_path)
+        print(f"\n🎉 Enhanced icon set ready: {args.output_path}")
+    else:
+        enhance_icon(args.input_path, args.output_path)
+        print(f"\n🎉 Enhanced icon ready: {args.output_path}")
@@ -0,0 +1,73 @@
+# Copyright 2025 DrWave
+#
+# WorldWideWaves is an ephemeral mobile app designed to orchestrate human waves through cities and
+# countries. The project aims to transcend physical and cultural
+# boundaries, fostering unity, community, and shared human experience by leveraging real-time
+# coordination and location-based services.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Image effects shared by the iOS and Android icon scripts.
+"""
+
+from PIL import Image
+import numpy as np
+
+def enhance_colors(img, contrast, color, brightness):
+    """
+    Apply contrast, saturation and brightness in one NumPy pass.
+    Equivalent to chaining ImageEnhance.Contrast, Color and Brightness.
+    """
+    mean = int(np.asarray(img.convert('L')).mean() + 0.5)
+
+    arr = np.asarray(img, np.float32)
+    # Truncate after each step like Image.blend does
+    rgb = np.clip(np.floor((arr[..., :3] - mean) * contrast + mean), 0, 255)
+    # Gray comes from Pillow's fixed-point luma so saturation matches ImageEnhance.Color
+    gray = np.asarray(Image.fromarray(rgb.astype(np.uint8), 'RGB').convert('L'), np.float32)[..., None]
+    rgb = np.clip(np.floor((rgb - gray) * color + gray), 0, 255)
+    arr[..., :3] = np.clip(rgb * brightness, 0, 255)
+
+    return Image.fromarray(arr.astype(np.uint8), 'RGBA')
+
+def add_white_overlay(img, shine_peak, shine_exp, glow_radius_frac, glow_peak):
+    """
+    Composite a top shine gradient and a center radial glow in one pass.
+    Both are pure white, so their alphas merge as 1 - (1 - a)(1 - b).
+    """
+    size = img.size[0]
+
+    # Top shine gradient
+    half = size // 2
+    ramp = np.zeros(size, np.float32)
+    ramp[:half] = shine_peak * (1 - np.arange(half) / half) ** shine_exp
+
+    # Center radial glow
+    center = size // 2
+    radius = center * glow_radius_frac
+    yy, xx = np.ogrid[:size, :size]
+    distance = np.hypot(xx - center, yy - center)
+
+    glow = np.zeros((size, size), np.uint8)
+    inside = distance < radius
+    glow[inside] = (glow_peak * (1 - distance[inside] / radius) ** 2).astype(np.uint8)
+
+    shine_alpha = ramp.astype(np.uint16)[:, None]
+    alpha = 255 - (255 - shine_alpha) * (255 - glow) // 255
+
+    overlay = np.zeros((size, size, 4), np.uint8)
+    overlay[..., :3] = 255
+    overlay[..., 3] = alpha
+
+    return Image.alpha_composite(img, Image.fromarray(overlay, 'RGBA'))